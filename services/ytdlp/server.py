@@ -5,14 +5,22 @@ Provides a JSON API for video extraction and search functionality
 """
 
 import asyncio
+import gzip
 import json
 import logging
+import math
 import os
+import sqlite3
 import sys
+import threading
 import time
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import count, islice
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
 
 import aiohttp
 from aiohttp import web, ClientSession
@@ -20,18 +28,189 @@ import yt_dlp
 from concurrent.futures import ThreadPoolExecutor
 import argparse
 
+try:
+    import orjson
+except ImportError:  # optional, see requirements.txt
+    orjson = None
+
+# Request body decoder, preferring orjson when available
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _dumps(payload: Any) -> bytes:
+    """Serialize payload to JSON bytes, preferring orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode('utf-8')
+
+
+def _json(payload: Any, status: int = 200) -> web.Response:
+    """Build a JSON response from a payload"""
+    return _json_body(_dumps(payload), status=status)
+
+
+def _json_body(body: bytes, status: int = 200) -> web.Response:
+    """Build a JSON response from pre-encoded bytes"""
+    return web.Response(body=body, status=status, content_type='application/json')
+
+
+# Hosts serving the regular YouTube watch page, and path prefixes that
+# carry a video ID as their next segment
+_YOUTUBE_HOSTS = ('youtube.com', 'www.youtube.com', 'm.youtube.com', 'music.youtube.com')
+_YOUTUBE_ID_PATHS = ('/shorts/', '/embed/', '/live/', '/v/')
+
+# YouTube query parameters that don't change what gets extracted
+_YOUTUBE_IGNORED_PARAMS = ('feature', 'si', 'pp', 't', 'ab_channel')
+
+
+def _normalize_url(url: str) -> str:
+    """Canonicalize a URL for use as a cache key
+
+    YouTube links in any of the common forms map to the watch URL with just
+    the video ID; other YouTube URLs drop their fragment and the parameters
+    in _YOUTUBE_IGNORED_PARAMS. Every URL gets a lowercased scheme and host
+    and loses utm_* parameters, but other hosts otherwise keep their query
+    and fragment untouched. The original URL is still what gets passed to
+    yt-dlp.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    path = parts.path
+    is_youtube = host == 'youtu.be' or host in _YOUTUBE_HOSTS
+    video_id = ''
+
+    if host == 'youtu.be':
+        video_id = path.strip('/').split('/')[0]
+    elif host in _YOUTUBE_HOSTS:
+        if path == '/watch':
+            # noplaylist is set, so only the video ID matters here
+            video_id = dict(parse_qsl(parts.query)).get('v', '')
+        else:
+            for prefix in _YOUTUBE_ID_PATHS:
+                if path.startswith(prefix):
+                    video_id = path[len(prefix):].split('/')[0]
+                    break
+
+    if video_id:
+        return f"https://www.youtube.com/watch?v={video_id}"
+
+    # Filter the raw pairs so kept parameters retain their exact encoding
+    params = []
+    for param in parts.query.split('&'):
+        name = param.split('=', 1)[0]
+        if not param or name.startswith('utm_'):
+            continue
+        if is_youtube and name in _YOUTUBE_IGNORED_PARAMS:
+            continue
+        params.append(param)
+
+    fragment = '' if is_youtube else parts.fragment
+    return urlunsplit((parts.scheme.lower(), host, path, '&'.join(params), fragment))
+
+
+def _normalize_query(query: str) -> str:
+    """Canonicalize a search query for use as a cache key"""
+    return query.strip().lower()
+
+
+# Cached bodies at least this large are served gzipped to clients that accept it
+_COMPRESSION_MIN_SIZE = 1024
+_COMPRESSION_LEVEL = 5
+
+
+def _compress(body: bytes) -> Optional[bytes]:
+    """Gzip a response body, or return None if it's small or doesn't shrink"""
+    if len(body) < _COMPRESSION_MIN_SIZE:
+        return None
+    compressed = gzip.compress(body, compresslevel=_COMPRESSION_LEVEL)
+    return compressed if len(compressed) < len(body) else None
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Check an Accept-Encoding header for gzip with a non-zero q-value"""
+    for coding in accept_encoding.split(','):
+        name, *params = coding.split(';')
+        if name.strip().lower() != 'gzip':
+            continue
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key.lower() == 'q':
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+# Fields kept from yt-dlp format and thumbnail entries, with their defaults
+_FORMAT_FIELDS = (
+    ('format_id', ''),
+    ('url', ''),
+    ('ext', ''),
+    ('format', ''),
+    ('protocol', None),
+    ('vcodec', None),
+    ('acodec', None),
+    ('width', None),
+    ('height', None),
+    ('fps', None),
+    ('tbr', None),
+    ('vbr', None),
+    ('abr', None),
+    ('asr', None),
+    ('filesize', None),
+    ('quality', None),
+    ('language', None),
+    ('preference', None),
+)
+
+_THUMBNAIL_FIELDS = (
+    ('id', None),
+    ('url', ''),
+    ('width', None),
+    ('height', None),
+    ('resolution', None),
+)
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """A cached, pre-encoded response body"""
+    body: bytes
+    timestamp: float
+    hits: int = 0
+    size: int = 0
+    gzip_body: Optional[bytes] = None
+
 
 class YTDLPService:
     """HTTP service wrapper for yt-dlp functionality"""
 
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.executor = ThreadPoolExecutor(max_workers=config.get('max_workers', 4))
         self.start_time = datetime.now()
+        # next() on an itertools.count is a single C-level call, so each
+        # increment is atomic under the GIL; the ints are what /health reads
+        self._requests = count(1)
+        self._errors = count(1)
         self.request_count = 0
         self.error_count = 0
-        self.cache = {}
-        self.cache_ttl = timedelta(hours=config.get('cache_ttl_hours', 24))
+        self.cache: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self.cache_ttl_seconds = int(config.get('cache_ttl_hours', 24) * 3600)
+        self.cache_max_entries = config.get('cache_max_entries', 1024)
+        self.cache_max_bytes = config.get('cache_max_bytes', 64 * 1024 * 1024)
+        self.cache_bytes = 0
+
+        # In-flight extractions keyed by cache key, so concurrent identical
+        # requests share one yt-dlp run instead of each starting their own
+        self.inflight: Dict[str, asyncio.Future] = {}
+
+        # Per-thread YoutubeDL instances, see _get_ydl
+        self._ydl_local = threading.local()
+
+        # Shared outbound HTTP session, created with the app in create_app.
+        # Outbound helpers must take this session rather than open their own.
+        self.http_session: Optional[ClientSession] = None
 
         # Create cache directory
         cache_dir = Path(config.get('cache_dir', '/tmp/ytdlp-cache'))
@@ -44,6 +223,31 @@ class YTDLPService:
         )
         self.logger = logging.getLogger('ytdlp-service')
 
+        # yt-dlp work is mostly network-bound; cap the pool so large
+        # overrides don't just add memory and context switching
+        self.max_workers = min(
+            config.get('max_workers', 4),
+            max(2, 2 * (os.cpu_count() or 1))
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='ytdlp'
+        )
+        self.logger.info(f"Using {self.max_workers} yt-dlp worker threads")
+
+        # Write-through disk cache so hot entries survive restarts. The sqlite
+        # connection lives on its own single worker thread, so lookups don't
+        # queue behind yt-dlp runs and the connection is never shared.
+        self.db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ytdlp-db')
+        self.db: Optional[sqlite3.Connection] = None
+        self.cache_db_max_entries = config.get('cache_db_max_entries', 10000)
+        db_path = config.get('cache_db', str(cache_dir / 'cache.db'))
+        if db_path:
+            try:
+                self.db = self.db_executor.submit(self._open_db, db_path).result()
+            except sqlite3.Error as e:
+                self.logger.error(f"Disk cache disabled, failed to open {db_path}: {str(e)}")
+
         # Common yt-dlp options
         self.ytdl_opts = {
             'format': config.get('format', 'bestaudio/best'),
@@ -68,7 +272,7 @@ class YTDLPService:
     async def health_check(self, request):
         """Health check endpoint"""
         uptime = datetime.now() - self.start_time
-        return web.json_response({
+        return _json({
             'success': True,
             'data': {
                 'status': 'healthy',
@@ -76,7 +280,7 @@ class YTDLPService:
                 'uptime': str(uptime),
                 'request_count': self.request_count,
                 'error_count': self.error_count,
-                'worker_count': self.config.get('max_workers', 4),
+                'worker_count': self.max_workers,
                 'last_check': datetime.now().isoformat()
             }
         })
@@ -84,101 +288,112 @@ class YTDLPService:
     async def extract_info(self, request):
         """Extract video information from URL"""
         try:
-            data = await request.json()
+            data = await request.json(loads=_loads)
             url = data.get('url')
 
             if not url:
-                return web.json_response({
+                return _json({
                     'success': False,
                     'error': 'URL is required',
                     'code': 400
                 }, status=400)
 
-            self.request_count += 1
+            self.request_count = next(self._requests)
 
             # Check cache first
-            cache_key = f"extract:{url}"
-            if cache_key in self.cache:
-                cache_entry = self.cache[cache_key]
-                if datetime.now() - cache_entry['timestamp'] < self.cache_ttl:
-                    self.logger.info(f"Cache hit for URL: {url}")
-                    return web.json_response({
-                        'success': True,
-                        'data': cache_entry['data']
-                    })
+            # Format overrides get their own entry since they use their own YoutubeDL
+            cache_key = f"extract:{data.get('format') or ''}:{_normalize_url(url)}"
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                self.logger.info(f"Cache hit for URL: {url}")
+                return self._cached_response(request, cached)
 
             # Extract info using yt-dlp
-            loop = asyncio.get_event_loop()
-            info = await loop.run_in_executor(
-                self.executor,
+            entry = await self._run_once(
+                cache_key,
                 self._extract_info_sync,
                 url,
                 data.get('format')
             )
 
-            if info:
-                # Cache the result
-                self.cache[cache_key] = {
-                    'data': info,
-                    'timestamp': datetime.now()
-                }
-
-                return web.json_response({
-                    'success': True,
-                    'data': info
-                })
+            if entry is not None:
+                return self._cached_response(request, entry)
             else:
-                self.error_count += 1
-                return web.json_response({
+                self.error_count = next(self._errors)
+                return _json({
                     'success': False,
                     'error': 'Failed to extract video information',
                     'code': 404
                 }, status=404)
 
         except Exception as e:
-            self.error_count += 1
+            self.error_count = next(self._errors)
             self.logger.error(f"Error extracting info: {str(e)}")
-            return web.json_response({
+            return _json({
                 'success': False,
                 'error': str(e),
                 'code': 500
             }, status=500)
 
+    def _get_ydl(self, format_override: Optional[str] = None, flat: bool = False) -> yt_dlp.YoutubeDL:
+        """Return the calling thread's YoutubeDL instance for a format
+
+        Building a YoutubeDL is expensive, so each executor thread keeps one per
+        format and reuses it. Instances aren't shared between threads since
+        yt-dlp isn't thread-safe per instance. With flat=True, playlist
+        entries are returned without resolving each one.
+        """
+        instances = getattr(self._ydl_local, 'instances', None)
+        if instances is None:
+            instances = self._ydl_local.instances = {}
+
+        fmt = format_override or self.ytdl_opts['format']
+        key = (fmt, flat)
+        ydl = instances.get(key)
+        if ydl is None:
+            # Format overrides come from clients; keep the per-thread set small
+            if len(instances) >= 8:
+                instances.pop(next(iter(instances))).close()
+
+            opts = self.ytdl_opts.copy()
+            opts['format'] = fmt
+            if flat:
+                opts['extract_flat'] = 'in_playlist'
+            ydl = instances[key] = yt_dlp.YoutubeDL(opts)
+
+        return ydl
+
     def _extract_info_sync(self, url: str, format_override: Optional[str] = None) -> Optional[Dict]:
         """Synchronous video info extraction"""
         try:
-            opts = self.ytdl_opts.copy()
-            if format_override:
-                opts['format'] = format_override
-
-            with yt_dlp.YoutubeDL(opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-
-                if not info:
-                    return None
-
-                # Clean and structure the info
-                clean_info = {
-                    'id': info.get('id', ''),
-                    'title': info.get('title', ''),
-                    'description': info.get('description', ''),
-                    'duration': info.get('duration'),
-                    'webpage_url': info.get('webpage_url', url),
-                    'thumbnail': self._get_best_thumbnail(info.get('thumbnails', [])),
-                    'uploader': info.get('uploader', ''),
-                    'upload_date': info.get('upload_date', ''),
-                    'view_count': info.get('view_count'),
-                    'extractor': info.get('extractor', ''),
-                    'extractor_key': info.get('extractor_key', ''),
-                    'available': True,
-                    'live_status': info.get('live_status'),
-                    'tags': info.get('tags', []),
-                    'categories': info.get('categories', []),
-                    'formats': self._clean_formats(info.get('formats', [])),
-                    'thumbnails': self._clean_thumbnails(info.get('thumbnails', []))
-                }
+            ydl = self._get_ydl(format_override)
+            info = ydl.extract_info(url, download=False)
+
+            if not info:
+                return None
+
+            # Clean and structure the info
+            clean_info = {
+                'id': info.get('id', ''),
+                'title': info.get('title', ''),
+                'description': info.get('description', ''),
+                'duration': info.get('duration'),
+                'webpage_url': info.get('webpage_url', url),
+                'thumbnail': self._get_best_thumbnail(info.get('thumbnails', [])),
+                'uploader': info.get('uploader', ''),
+                'upload_date': info.get('upload_date', ''),
+                'view_count': info.get('view_count'),
+                'extractor': info.get('extractor', ''),
+                'extractor_key': info.get('extractor_key', ''),
+                'available': True,
+                'live_status': info.get('live_status'),
+                'tags': info.get('tags', []),
+                'categories': info.get('categories', []),
+                'formats': self._clean_formats(info.get('formats', [])),
+                'thumbnails': self._clean_thumbnails(info.get('thumbnails', []))
+            }
 
-                return clean_info
+            return clean_info
 
         except Exception as e:
             self.logger.error(f"yt-dlp extraction error for {url}: {str(e)}")
@@ -187,62 +402,49 @@ class YTDLPService:
     async def search(self, request):
         """Search for videos"""
         try:
-            data = await request.json()
+            data = await request.json(loads=_loads)
             query = data.get('query')
             max_results = data.get('max_results', 10)
 
             if not query:
-                return web.json_response({
+                return _json({
                     'success': False,
                     'error': 'Query is required',
                     'code': 400
                 }, status=400)
 
-            self.request_count += 1
+            self.request_count = next(self._requests)
 
             # Check cache first
-            cache_key = f"search:{query}:{max_results}"
-            if cache_key in self.cache:
-                cache_entry = self.cache[cache_key]
-                if datetime.now() - cache_entry['timestamp'] < self.cache_ttl:
-                    self.logger.info(f"Cache hit for search: {query}")
-                    return web.json_response({
-                        'success': True,
-                        'data': cache_entry['data']
-                    })
+            # Hits echo the first caller's spelling of the query back
+            cache_key = f"search:{_normalize_query(query)}:{max_results}"
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                self.logger.info(f"Cache hit for search: {query}")
+                return self._cached_response(request, cached)
 
             # Perform search using yt-dlp
-            loop = asyncio.get_event_loop()
-            results = await loop.run_in_executor(
-                self.executor,
+            entry = await self._run_once(
+                cache_key,
                 self._search_sync,
                 query,
                 max_results
             )
 
-            if results is not None:
-                # Cache the result
-                self.cache[cache_key] = {
-                    'data': results,
-                    'timestamp': datetime.now()
-                }
-
-                return web.json_response({
-                    'success': True,
-                    'data': results
-                })
+            if entry is not None:
+                return self._cached_response(request, entry)
             else:
-                self.error_count += 1
-                return web.json_response({
+                self.error_count = next(self._errors)
+                return _json({
                     'success': False,
                     'error': 'Search failed',
                     'code': 500
                 }, status=500)
 
         except Exception as e:
-            self.error_count += 1
+            self.error_count = next(self._errors)
             self.logger.error(f"Error searching: {str(e)}")
-            return web.json_response({
+            return _json({
                 'success': False,
                 'error': str(e),
                 'code': 500
@@ -253,47 +455,51 @@ class YTDLPService:
         try:
             search_query = f"ytsearch{max_results}:{query}"
 
-            opts = self.ytdl_opts.copy()
-            opts['quiet'] = True
-
-            with yt_dlp.YoutubeDL(opts) as ydl:
-                search_results = ydl.extract_info(search_query, download=False)
-
-                if not search_results or 'entries' not in search_results:
-                    return {
-                        'videos': [],
-                        'total_count': 0,
-                        'query': query
-                    }
-
-                videos = []
-                for entry in search_results['entries'][:max_results]:
-                    if entry:
-                        video_info = {
-                            'id': entry.get('id', ''),
-                            'title': entry.get('title', ''),
-                            'description': entry.get('description', ''),
-                            'duration': entry.get('duration'),
-                            'webpage_url': entry.get('webpage_url', ''),
-                            'thumbnail': self._get_best_thumbnail(entry.get('thumbnails', [])),
-                            'uploader': entry.get('uploader', ''),
-                            'upload_date': entry.get('upload_date', ''),
-                            'view_count': entry.get('view_count'),
-                            'extractor': entry.get('extractor', ''),
-                            'extractor_key': entry.get('extractor_key', ''),
-                            'available': True,
-                            'live_status': entry.get('live_status'),
-                            'formats': self._clean_formats(entry.get('formats', [])),
-                            'thumbnails': self._clean_thumbnails(entry.get('thumbnails', []))
-                        }
-                        videos.append(video_info)
+            # Flat extraction returns lightweight entries from the results page
+            # instead of fetching every video; callers use /extract for details
+            ydl = self._get_ydl(flat=True)
+            search_results = ydl.extract_info(search_query, download=False)
 
+            if not search_results or 'entries' not in search_results:
                 return {
-                    'videos': videos,
-                    'total_count': len(videos),
+                    'videos': [],
+                    'total_count': 0,
                     'query': query
                 }
 
+            # Bind the cleaners once rather than looking them up per entry
+            best_thumbnail = self._get_best_thumbnail
+            clean_formats = self._clean_formats
+            clean_thumbnails = self._clean_thumbnails
+
+            def clean_entry(entry: Dict) -> Dict:
+                thumbnails = entry.get('thumbnails', [])
+                return {
+                    'id': entry.get('id', ''),
+                    'title': entry.get('title', ''),
+                    'description': entry.get('description', ''),
+                    'duration': entry.get('duration'),
+                    'webpage_url': entry.get('webpage_url') or entry.get('url', ''),
+                    'thumbnail': best_thumbnail(thumbnails),
+                    'uploader': entry.get('uploader', ''),
+                    'upload_date': entry.get('upload_date', ''),
+                    'view_count': entry.get('view_count'),
+                    'extractor': entry.get('extractor') or (entry.get('ie_key') or '').lower(),
+                    'extractor_key': entry.get('extractor_key') or entry.get('ie_key') or '',
+                    'available': True,
+                    'live_status': entry.get('live_status'),
+                    'formats': clean_formats(entry.get('formats', [])),
+                    'thumbnails': clean_thumbnails(thumbnails)
+                }
+
+            videos = [clean_entry(entry) for entry in search_results['entries'][:max_results] if entry]
+
+            return {
+                'videos': videos,
+                'total_count': len(videos),
+                'query': query
+            }
+
         except Exception as e:
             self.logger.error(f"Search error for '{query}': {str(e)}")
             return None
@@ -303,88 +509,260 @@ class YTDLPService:
         if not thumbnails:
             return ""
 
-        # Sort by preference: width desc, then height desc
-        sorted_thumbs = sorted(
+        # Prefer the widest, then tallest; missing sizes count as 0
+        best = max(
             thumbnails,
-            key=lambda x: (x.get('width', 0), x.get('height', 0)),
-            reverse=True
+            key=lambda x: (x.get('width') or 0, x.get('height') or 0)
         )
 
-        return sorted_thumbs[0].get('url', '') if sorted_thumbs else ""
+        return best.get('url', '')
 
     def _clean_formats(self, formats: List[Dict]) -> List[Dict]:
         """Clean and filter format information"""
-        clean_formats = []
-        for fmt in formats:
-            clean_format = {
-                'format_id': fmt.get('format_id', ''),
-                'url': fmt.get('url', ''),
-                'ext': fmt.get('ext', ''),
-                'format': fmt.get('format', ''),
-                'protocol': fmt.get('protocol'),
-                'vcodec': fmt.get('vcodec'),
-                'acodec': fmt.get('acodec'),
-                'width': fmt.get('width'),
-                'height': fmt.get('height'),
-                'fps': fmt.get('fps'),
-                'tbr': fmt.get('tbr'),
-                'vbr': fmt.get('vbr'),
-                'abr': fmt.get('abr'),
-                'asr': fmt.get('asr'),
-                'filesize': fmt.get('filesize'),
-                'quality': fmt.get('quality'),
-                'language': fmt.get('language'),
-                'preference': fmt.get('preference'),
-            }
-            clean_formats.append(clean_format)
-
-        return clean_formats
+        return [{key: fmt.get(key, default) for key, default in _FORMAT_FIELDS} for fmt in formats]
 
     def _clean_thumbnails(self, thumbnails: List[Dict]) -> List[Dict]:
         """Clean thumbnail information"""
-        clean_thumbnails = []
-        for thumb in thumbnails:
-            clean_thumb = {
-                'id': thumb.get('id'),
-                'url': thumb.get('url', ''),
-                'width': thumb.get('width'),
-                'height': thumb.get('height'),
-                'resolution': thumb.get('resolution'),
-            }
-            clean_thumbnails.append(clean_thumb)
-
-        return clean_thumbnails
+        return [{key: thumb.get(key, default) for key, default in _THUMBNAIL_FIELDS} for thumb in thumbnails]
 
     async def clear_cache(self, request):
         """Clear the service cache"""
         try:
             self.cache.clear()
-            return web.json_response({
+            self.cache_bytes = 0
+            await self._run_db(self._disk_clear)
+            return _json({
                 'success': True,
                 'data': {'message': 'Cache cleared successfully'}
             })
         except Exception as e:
-            return web.json_response({
+            return _json({
                 'success': False,
                 'error': str(e),
                 'code': 500
             }, status=500)
 
+    async def _run_once(self, cache_key: str, func, *args) -> Optional[CacheEntry]:
+        """Run func on the executor once per cache key, sharing the result
+
+        Concurrent callers with the same key await the same task. The task is
+        shielded so a disconnecting client doesn't cancel it for the others.
+        """
+        task = self.inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(cache_key, func, *args))
+            self.inflight[cache_key] = task
+
+        return await asyncio.shield(task)
+
+    async def _fetch(self, cache_key: str, func, *args) -> Optional[CacheEntry]:
+        """Run func on the executor and cache its encoded success response"""
+        try:
+            row = await self._run_db(self._disk_get, cache_key)
+            if row is not None:
+                body, gzip_body, stored_at = row
+                self.logger.info(f"Disk cache hit for {cache_key}")
+                # Carry the entry's age over so it expires on the original schedule
+                return self._cache_put(
+                    cache_key, body, gzip_body,
+                    time.monotonic() - (time.time() - stored_at)
+                )
+
+            encoded = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._run_and_encode, func, *args
+            )
+
+            if encoded is None:
+                return None
+
+            body, gzip_body = encoded
+            entry = self._cache_put(cache_key, body, gzip_body)
+            await self._run_db(self._disk_put, cache_key, body, time.time())
+            return entry
+
+        finally:
+            del self.inflight[cache_key]
+
+    def _run_and_encode(self, func, *args) -> Optional[Tuple[bytes, Optional[bytes]]]:
+        """Run func and encode its success response, off the event loop
+
+        Encoding and compressing a large extract takes milliseconds, so it's
+        done on the worker thread alongside the yt-dlp call. Cache hits then
+        serve these bytes without encoding again.
+        """
+        result = func(*args)
+        if not result:
+            return None
+
+        body = _dumps({
+            'success': True,
+            'data': result
+        })
+        return body, _compress(body)
+
+    def _cached_response(self, request: web.Request, entry: CacheEntry) -> web.Response:
+        """Serve a cache entry, using its stored gzip body if the client accepts it"""
+        if (entry.gzip_body is not None
+                and _accepts_gzip(request.headers.get('Accept-Encoding', ''))):
+            response = _json_body(entry.gzip_body)
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = _json_body(entry.body)
+
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+
+    def _cache_get(self, key: str) -> Optional[CacheEntry]:
+        """Return the cache entry for key, dropping it if expired"""
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+
+        if time.monotonic() - entry.timestamp >= self.cache_ttl_seconds:
+            self._cache_remove(key)
+            return None
+
+        entry.hits += 1
+        self.cache.move_to_end(key)
+        return entry
+
+    def _cache_put(self, key: str, body: bytes, gzip_body: Optional[bytes] = None,
+                   timestamp: Optional[float] = None) -> CacheEntry:
+        """Store a response body in the cache, evicting low-value entries when over budget"""
+        if key in self.cache:
+            self._cache_remove(key)
+
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        # Large bodies are kept in both forms so hits never re-run zlib
+        size = len(body) + (len(gzip_body) if gzip_body is not None else 0)
+
+        entry = CacheEntry(body=body, timestamp=timestamp, size=size, gzip_body=gzip_body)
+
+        # An entry over the whole byte budget would evict everything else and
+        # then itself, so serve it without caching
+        if entry.size > self.cache_max_bytes:
+            return entry
+
+        self.cache[key] = entry
+        self.cache_bytes += entry.size
+
+        while self.cache and (len(self.cache) > self.cache_max_entries
+                              or self.cache_bytes > self.cache_max_bytes):
+            self._cache_remove(self._eviction_candidate())
+
+        return entry
+
+    def _cache_remove(self, key: str):
+        """Remove a single entry and release its size from the byte budget"""
+        entry = self.cache.pop(key)
+        self.cache_bytes -= entry.size
+
+    def _eviction_candidate(self) -> str:
+        """Pick the lowest-value entry from the least recently used 10% (v-LRU)
+
+        Entries are scored by log(hits + 1/size + 1e-6), so cold and large
+        entries are evicted before hot or small ones of similar recency.
+        """
+        tail = islice(self.cache.items(), max(1, len(self.cache) // 10))
+        key, _ = min(
+            tail,
+            key=lambda item: math.log(item[1].hits + 1.0 / max(item[1].size, 1) + 1e-6)
+        )
+        return key
+
     def cleanup_cache(self):
-        """Remove expired entries from cache"""
-        now = datetime.now()
-        expired_keys = []
+        """Remove expired entries from the cache
 
-        for key, entry in self.cache.items():
-            if now - entry['timestamp'] > self.cache_ttl:
-                expired_keys.append(key)
+        Hits reorder entries, so LRU order doesn't follow insertion time and
+        the whole cache is scanned. It's bounded by cache_max_entries.
+        """
+        now = time.monotonic()
+        expired_keys = [
+            key for key, entry in self.cache.items()
+            if now - entry.timestamp >= self.cache_ttl_seconds
+        ]
 
         for key in expired_keys:
-            del self.cache[key]
+            self._cache_remove(key)
 
         if expired_keys:
             self.logger.info(f"Cleaned up {len(expired_keys)} expired cache entries")
 
+    async def cleanup_disk_cache(self):
+        """Remove expired entries from the disk cache and trim it to its row cap"""
+        removed = await self._run_db(self._disk_cleanup, time.time() - self.cache_ttl_seconds)
+        if removed:
+            self.logger.info(f"Removed {removed} expired or over-cap disk cache entries")
+
+    async def close_db(self):
+        """Close the disk cache connection and its worker thread"""
+        if self.db is not None:
+            await asyncio.get_running_loop().run_in_executor(self.db_executor, self.db.close)
+            self.db = None
+        self.db_executor.shutdown(wait=False)
+
+    async def _run_db(self, func, *args) -> Any:
+        """Run a disk cache operation on the db thread
+
+        Disk cache failures are logged and treated as misses so they never
+        fail a request.
+        """
+        if self.db is None:
+            return None
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.db_executor, func, *args)
+        except sqlite3.Error as e:
+            self.logger.error(f"Disk cache error: {str(e)}")
+            return None
+
+    def _open_db(self, path: str) -> sqlite3.Connection:
+        """Open the disk cache database, creating the schema if needed"""
+        db = sqlite3.connect(path)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        db.execute('CREATE TABLE IF NOT EXISTS kv(k TEXT PRIMARY KEY, body BLOB, ts REAL)')
+        db.execute('CREATE INDEX IF NOT EXISTS kv_ts ON kv(ts)')
+        db.commit()
+        return db
+
+    def _disk_get(self, key: str) -> Optional[Tuple[bytes, Optional[bytes], float]]:
+        """Return (body, gzip body, wall-clock timestamp) for a live disk cache entry"""
+        row = self.db.execute('SELECT body, ts FROM kv WHERE k = ?', (key,)).fetchone()
+        if row is None or time.time() - row[1] >= self.cache_ttl_seconds:
+            return None
+
+        body, ts = row
+        # Compressed here on the db thread to keep zlib off the event loop
+        return body, _compress(body), ts
+
+    def _disk_put(self, key: str, body: bytes, ts: float):
+        """Write a response body through to the disk cache"""
+        self.db.execute('INSERT OR REPLACE INTO kv(k, body, ts) VALUES (?, ?, ?)', (key, body, ts))
+        self.db.commit()
+
+    def _disk_cleanup(self, cutoff: float) -> int:
+        """Delete disk cache entries stored before cutoff, then the oldest over the row cap"""
+        removed = self.db.execute('DELETE FROM kv WHERE ts < ?', (cutoff,)).rowcount
+
+        (rows,) = self.db.execute('SELECT COUNT(*) FROM kv').fetchone()
+        excess = rows - self.cache_db_max_entries
+        if excess > 0:
+            removed += self.db.execute(
+                'DELETE FROM kv WHERE k IN (SELECT k FROM kv ORDER BY ts LIMIT ?)',
+                (excess,)
+            ).rowcount
+
+        self.db.commit()
+        return removed
+
+    def _disk_clear(self):
+        """Delete every disk cache entry"""
+        self.db.execute('DELETE FROM kv')
+        self.db.commit()
+
 
 async def create_app(config: Dict[str, Any]) -> web.Application:
     """Create the aiohttp application"""
@@ -392,6 +770,14 @@ async def create_app(config: Dict[str, Any]) -> web.Application:
 
     app = web.Application()
 
+    # One pooled session for the service lifetime
+    app['http_session'] = ClientSession(
+        connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=75)
+    )
+    service.http_session = app['http_session']
+    app.on_cleanup.append(close_http_session)
+    app.on_cleanup.append(close_cache_db)
+
     # Add routes
     app.router.add_get('/health', service.health_check)
     app.router.add_post('/extract', service.extract_info)
@@ -404,6 +790,16 @@ async def create_app(config: Dict[str, Any]) -> web.Application:
     return app
 
 
+async def close_http_session(app: web.Application):
+    """Close the shared outbound HTTP session"""
+    await app['http_session'].close()
+
+
+async def close_cache_db(app: web.Application):
+    """Close the service's disk cache"""
+    await app['service'].close_db()
+
+
 async def cleanup_task(app: web.Application):
     """Periodic cleanup task"""
     service = app['service']
@@ -412,6 +808,7 @@ async def cleanup_task(app: web.Application):
         await asyncio.sleep(300)  # Run every 5 minutes
         try:
             service.cleanup_cache()
+            await service.cleanup_disk_cache()
         except Exception as e:
             service.logger.error(f"Cache cleanup error: {str(e)}")
 
@@ -436,6 +833,9 @@ def main():
         'audio_quality': '128',
         'cache_dir': '/tmp/ytdlp-cache',
         'cache_ttl_hours': 24,
+        'cache_max_entries': 1024,
+        'cache_max_bytes': 64 * 1024 * 1024,
+        'cache_db_max_entries': 10000,
     }
 
     if args.config and os.path.exists(args.config):
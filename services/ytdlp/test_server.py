@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Tests for the yt-dlp HTTP service
+Run with: python3 -m unittest discover -s services/ytdlp
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from server import (
+    YTDLPService, _accepts_gzip, _compress, _normalize_query, _normalize_url, create_app
+)
+
+
+class TestNormalizeURL(unittest.TestCase):
+    """Tests for cache key URL normalization"""
+
+    def test_youtube_forms_map_to_watch_url(self):
+        expected = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+        urls = [
+            'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+            'https://youtu.be/dQw4w9WgXcQ',
+            'https://youtu.be/dQw4w9WgXcQ?si=abc123',
+            'https://www.youtube.com/watch?v=dQw4w9WgXcQ&feature=share&t=10s',
+            'https://www.youtube.com/watch?list=PL123&v=dQw4w9WgXcQ&pp=xyz',
+            'HTTPS://M.YouTube.com/watch?v=dQw4w9WgXcQ',
+            'https://music.youtube.com/watch?v=dQw4w9WgXcQ&si=abc123',
+            'https://music.youtube.com/watch?v=dQw4w9WgXcQ&list=RDAMVM&feature=share',
+            'https://youtube.com/shorts/dQw4w9WgXcQ?feature=share',
+            'https://www.youtube.com/embed/dQw4w9WgXcQ',
+            'https://www.youtube.com/live/dQw4w9WgXcQ',
+            '  https://www.youtube.com/watch?v=dQw4w9WgXcQ#t=30  ',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(_normalize_url(url), expected)
+
+    def test_distinct_youtube_videos_stay_distinct(self):
+        self.assertNotEqual(
+            _normalize_url('https://youtu.be/aaaaaaaaaaa'),
+            _normalize_url('https://youtu.be/bbbbbbbbbbb')
+        )
+
+    def test_youtube_without_video_id_drops_ignored_params(self):
+        self.assertEqual(
+            _normalize_url('https://www.youtube.com/playlist?list=PL123&si=abc&utm_source=x#top'),
+            'https://www.youtube.com/playlist?list=PL123'
+        )
+
+    def test_other_hosts_keep_query_and_fragment(self):
+        cases = [
+            ('https://example.com/a?t=tok1', 'https://example.com/a?t=tok1'),
+            ('https://www.twitch.tv/videos/1?t=1h', 'https://www.twitch.tv/videos/1?t=1h'),
+            ('https://example.com/#/video/1', 'https://example.com/#/video/1'),
+            ('https://example.com/a?feature=x&si=y', 'https://example.com/a?feature=x&si=y'),
+            ('https://example.com/a?q=a%20b+c', 'https://example.com/a?q=a%20b+c'),
+        ]
+        for url, expected in cases:
+            with self.subTest(url=url):
+                self.assertEqual(_normalize_url(url), expected)
+
+    def test_other_hosts_do_not_collide(self):
+        self.assertNotEqual(
+            _normalize_url('https://example.com/a?t=tok1'),
+            _normalize_url('https://example.com/a?t=tok2')
+        )
+        self.assertNotEqual(
+            _normalize_url('https://example.com/#/video/1'),
+            _normalize_url('https://example.com/#/video/2')
+        )
+
+    def test_other_hosts_lowercase_host_and_strip_utm(self):
+        self.assertEqual(
+            _normalize_url('HTTPS://SoundCloud.com/Artist/Track?utm_source=x&in=set&utm_medium=y'),
+            'https://soundcloud.com/Artist/Track?in=set'
+        )
+
+    def test_non_url_input_passes_through(self):
+        self.assertEqual(_normalize_url('ytsearch:some song'), 'ytsearch:some song')
+
+
+class TestNormalizeQuery(unittest.TestCase):
+    """Tests for cache key search query normalization"""
+
+    def test_case_and_surrounding_whitespace_are_ignored(self):
+        for query in ('Never Gonna Give You Up', '  never gonna give you up\n', 'NEVER GONNA GIVE YOU UP'):
+            with self.subTest(query=query):
+                self.assertEqual(_normalize_query(query), 'never gonna give you up')
+
+    def test_distinct_queries_stay_distinct(self):
+        self.assertNotEqual(_normalize_query('song a'), _normalize_query('song b'))
+
+
+class TestCompression(unittest.TestCase):
+    """Tests for gzip handling of cached bodies"""
+
+    def test_accepts_gzip(self):
+        cases = [
+            ('gzip', True),
+            ('gzip, deflate, br', True),
+            ('deflate, GZIP;q=0.5', True),
+            ('gzip;q=0', False),
+            ('gzip; q=0.0, deflate', False),
+            ('deflate, br', False),
+            ('', False),
+        ]
+        for header, expected in cases:
+            with self.subTest(header=header):
+                self.assertEqual(_accepts_gzip(header), expected)
+
+    def test_compress_skips_small_and_incompressible_bodies(self):
+        self.assertIsNone(_compress(b'{"success": true}'))
+        self.assertIsNone(_compress(os.urandom(4096)))
+
+        body = b'{"format_id": "251", "ext": "webm"}' * 200
+        self.assertLess(len(_compress(body)), len(body))
+
+
+class TestCacheEviction(unittest.TestCase):
+    """Tests for the in-memory v-LRU cache"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.service = YTDLPService({
+            'cache_dir': self.cache_dir.name,
+            'cache_db': '',
+            'cache_max_entries': 20,
+            'cache_max_bytes': 20000,
+        })
+
+    def tearDown(self):
+        self.service.executor.shutdown()
+        self.service.db_executor.shutdown()
+        self.cache_dir.cleanup()
+
+    def test_evicts_lowest_score_in_lru_tail(self):
+        for i in range(20):
+            self.service._cache_put(str(i), b'x' * 100)
+
+        # '0' and '1' form the LRU tail; the hotter '0' should survive
+        self.service.cache['0'].hits = 5
+        self.service._cache_put('new', b'x' * 100)
+
+        self.assertIn('0', self.service.cache)
+        self.assertNotIn('1', self.service.cache)
+        self.assertEqual(len(self.service.cache), 20)
+
+    def test_oversized_entry_is_not_cached(self):
+        for i in range(10):
+            self.service._cache_put(str(i), b'x' * 500)
+
+        entry = self.service._cache_put('huge', os.urandom(25000))
+
+        self.assertEqual(len(entry.body), 25000)
+        self.assertNotIn('huge', self.service.cache)
+        self.assertEqual(len(self.service.cache), 10)
+        self.assertEqual(self.service.cache_bytes, 5000)
+
+
+class TestCacheKeys(unittest.IsolatedAsyncioTestCase):
+    """Tests for how extract and search requests share cache entries"""
+
+    async def asyncSetUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        app = await create_app({'cache_dir': self.cache_dir.name, 'cache_db': ''})
+        self.service = app['service']
+        self.calls = []
+
+        def fake_extract(url, format_override=None):
+            self.calls.append((url, format_override))
+            return {'id': url, 'format': format_override}
+
+        def fake_search(query, max_results):
+            self.calls.append((query, max_results))
+            return {'videos': [], 'total_count': 0, 'query': query}
+
+        self.service._extract_info_sync = fake_extract
+        self.service._search_sync = fake_search
+        self.client = TestClient(TestServer(app))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        self.cache_dir.cleanup()
+
+    async def post(self, path, payload):
+        response = await self.client.post(path, json=payload)
+        return await response.json()
+
+    async def test_equivalent_urls_share_an_entry(self):
+        await self.post('/extract', {'url': 'https://youtu.be/dQw4w9WgXcQ'})
+        await self.post('/extract', {'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&si=x'})
+        self.assertEqual(len(self.calls), 1)
+
+    async def test_format_override_gets_its_own_entry(self):
+        url = 'https://youtu.be/dQw4w9WgXcQ'
+        await self.post('/extract', {'url': url})
+        result = await self.post('/extract', {'url': url, 'format': 'worstaudio'})
+
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(result['data']['format'], 'worstaudio')
+
+    async def test_concurrent_requests_share_one_run(self):
+        def slow_extract(url, format_override=None):
+            self.calls.append((url, format_override))
+            time.sleep(0.1)
+            return {'id': url}
+
+        self.service._extract_info_sync = slow_extract
+        responses = await asyncio.gather(*[
+            self.client.post('/extract', json={'url': 'https://youtu.be/dQw4w9WgXcQ'})
+            for _ in range(5)
+        ])
+
+        self.assertEqual([response.status for response in responses], [200] * 5)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.service.inflight, {})
+
+    async def test_failed_shared_run_fails_every_waiter(self):
+        def failing_extract(url, format_override=None):
+            self.calls.append((url, format_override))
+            time.sleep(0.1)
+            raise RuntimeError('extractor exploded')
+
+        self.service._extract_info_sync = failing_extract
+        responses = await asyncio.gather(*[
+            self.client.post('/extract', json={'url': 'https://youtu.be/dQw4w9WgXcQ'})
+            for _ in range(5)
+        ])
+
+        self.assertEqual([response.status for response in responses], [500] * 5)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.service.inflight, {})
+
+    async def test_large_bodies_are_served_gzipped_when_accepted(self):
+        self.service._extract_info_sync = lambda url, format_override=None: {
+            'id': url, 'formats': [{'format_id': str(i), 'ext': 'webm'} for i in range(100)]
+        }
+        url = 'https://youtu.be/dQw4w9WgXcQ'
+
+        for accept, expected in (('gzip', 'gzip'), ('gzip;q=0', None), ('identity', None)):
+            with self.subTest(accept=accept):
+                response = await self.client.post(
+                    '/extract', json={'url': url}, headers={'Accept-Encoding': accept}
+                )
+                self.assertEqual(response.headers.get('Content-Encoding'), expected)
+                self.assertEqual(len((await response.json())['data']['formats']), 100)
+
+    async def test_equivalent_queries_share_an_entry(self):
+        await self.post('/search', {'query': 'Hello World'})
+        result = await self.post('/search', {'query': '  hello world '})
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertTrue(result['success'])
+
+
+
+class TestDiskCache(unittest.IsolatedAsyncioTestCase):
+    """Tests for the write-through SQLite cache"""
+
+    URL = 'https://youtu.be/dQw4w9WgXcQ'
+    KEY = 'extract::https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+
+    async def asyncSetUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.config = {
+            'cache_dir': self.cache_dir.name,
+            'cache_db': os.path.join(self.cache_dir.name, 'cache.db'),
+            'cache_ttl_hours': 1,
+            'cache_db_max_entries': 3,
+        }
+        self.calls = []
+        self.clients = []
+        self.service, self.client = await self.start()
+
+    async def asyncTearDown(self):
+        for client in self.clients:
+            await client.close()
+        self.cache_dir.cleanup()
+
+    async def start(self, **overrides):
+        app = await create_app({**self.config, **overrides})
+        service = app['service']
+
+        def fake_extract(url, format_override=None):
+            self.calls.append(url)
+            return {'id': url}
+
+        service._extract_info_sync = fake_extract
+        client = TestClient(TestServer(app))
+        await client.start_server()
+        self.clients.append(client)
+        return service, client
+
+    async def extract(self, client=None):
+        response = await (client or self.client).post('/extract', json={'url': self.URL})
+        self.assertEqual(response.status, 200)
+        return await response.json()
+
+    async def rows(self):
+        return await self.service._run_db(
+            lambda: self.service.db.execute('SELECT k, ts FROM kv ORDER BY ts').fetchall()
+        )
+
+    async def test_write_through_and_hit_after_memory_clear(self):
+        await self.extract()
+        self.assertEqual([key for key, _ in await self.rows()], [self.KEY])
+
+        self.service.cache.clear()
+        self.service.cache_bytes = 0
+        result = await self.extract()
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(result['data']['id'], self.URL)
+        self.assertIn(self.KEY, self.service.cache)
+
+    async def test_survives_restart(self):
+        await self.extract()
+        service, client = await self.start()
+
+        await self.extract(client)
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertIn(self.KEY, service.cache)
+
+    async def test_disk_hit_keeps_its_age(self):
+        await self.service._run_db(
+            self.service._disk_put, self.KEY, b'{"success": true, "data": {}}', time.time() - 600
+        )
+
+        await self.extract()
+
+        self.assertEqual(self.calls, [])
+        age = time.monotonic() - self.service.cache[self.KEY].timestamp
+        self.assertAlmostEqual(age, 600, delta=5)
+
+    async def test_expired_disk_entry_is_a_miss_and_cleaned_up(self):
+        await self.service._run_db(
+            self.service._disk_put, self.KEY, b'{"success": true, "data": {}}', time.time() - 7200
+        )
+        await self.service._run_db(self.service._disk_put, 'other', b'{}', time.time())
+
+        await self.extract()
+        self.assertEqual(len(self.calls), 1)
+
+        await self.service._run_db(self.service._disk_put, 'stale', b'{}', time.time() - 7200)
+        await self.service.cleanup_disk_cache()
+        self.assertNotIn('stale', [key for key, _ in await self.rows()])
+
+    async def test_cleanup_trims_oldest_rows_over_cap(self):
+        now = time.time()
+        for i in range(5):
+            await self.service._run_db(self.service._disk_put, f'k{i}', b'{}', now - 50 + i)
+
+        await self.service.cleanup_disk_cache()
+
+        self.assertEqual([key for key, _ in await self.rows()], ['k2', 'k3', 'k4'])
+
+    async def test_clear_empties_table(self):
+        await self.extract()
+
+        response = await self.client.post('/cache/clear')
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(await self.rows(), [])
+        self.assertEqual(len(self.service.cache), 0)
+
+    async def test_disabled_disk_cache(self):
+        service, client = await self.start(cache_db='')
+        self.assertIsNone(service.db)
+
+        await self.extract(client)
+        service.cache.clear()
+        service.cache_bytes = 0
+        await self.extract(client)
+        await service.cleanup_disk_cache()
+
+        # With no disk cache, a memory miss goes back to yt-dlp
+        self.assertEqual(len(self.calls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()